@@ -0,0 +1,65 @@
+# File: backend/services/ml/test_analytics_engine.py
+# Purpose: Persistence tests for the ML analytics engine
+
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from analytics_engine import MLAnalyticsEngine
+
+
+def _events(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [
+        {
+            'id': i,
+            'severity': rng.choice(['mild', 'moderate', 'severe', 'life_threatening']),
+            'outcome': rng.choice(['recovered', 'recovering', 'not_recovered', 'death', 'unknown']),
+            'patient_age': rng.randint(0, 90),
+            'required_hospitalization': rng.random() < 0.3,
+            'life_threatening': rng.random() < 0.1,
+            'symptoms': ['symptom'] * rng.randint(0, 9),
+            'event_date': (datetime.now() - timedelta(days=rng.randint(0, 400))).strftime('%Y-%m-%d'),
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def model_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'models').mkdir()
+    return tmp_path / 'models'
+
+
+def test_scaler_round_trip_allows_retraining(model_dir):
+    trained = MLAnalyticsEngine()
+    trained.train_models(_events(200))
+    
+    reloaded = MLAnalyticsEngine()
+    assert hasattr(reloaded.risk_classifier, 'classes_')
+    np.testing.assert_array_equal(reloaded.scaler.mean_, trained.scaler.mean_)
+    np.testing.assert_array_equal(reloaded.scaler.scale_, trained.scaler.scale_)
+    assert reloaded.scaler.n_samples_seen_ == trained.scaler.n_samples_seen_
+    
+    result = reloaded.train_models(_events(200, seed=1))
+    assert result['risk_classifier_trained']
+    assert reloaded.scaler.n_samples_seen_ == 200
+
+
+def test_legacy_pickled_scaler_is_loaded_and_converted(model_dir):
+    import joblib
+    
+    trained = MLAnalyticsEngine()
+    trained.train_models(_events(200))
+    joblib.dump(trained.scaler, model_dir / 'scaler.pkl')
+    (model_dir / 'scaler.npz').unlink()
+    
+    reloaded = MLAnalyticsEngine()
+    assert hasattr(reloaded.risk_classifier, 'classes_')
+    assert (model_dir / 'scaler.npz').exists()
+    
+    reloaded.train_models(_events(200, seed=1))
+    assert MLAnalyticsEngine().scaler.n_samples_seen_ == 200